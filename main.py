@@ -8,6 +8,8 @@ from utils.walkforward import run_walkforward
 from utils.performance import performance_summary, plot_equity_curve
 from utils.broker_models import FuturesCommission
 from utils.grid_optimizer import run_grid_search, add_composite_score, plot_heatmap
+from utils.result_store import ResultStore
+from utils.band_cache import prime_band_cache
 from utils.walkforward_optimizer import run_walkforward_optimizer
 
 def run_backtest():
@@ -28,6 +30,9 @@ def run_backtest():
     contract_multipliers = {}
     data_dict = {}
 
+    # Multi-timeframe mode: breakout bands on `band_timeframe`, execution on `timeframe`
+    band_timeframe = config['strategy'].get('band_timeframe')
+
     # Load all symbols
     for symbol_info in config['symbols']:
         short_name = symbol_info['symbol']
@@ -38,7 +43,8 @@ def run_backtest():
         df = load_price_data(yf_symbol, interval=config['timeframe'])
         data = bt.feeds.PandasData(dataname=df)
 
-        cerebro.adddata(data, name=yf_symbol)
+        # Feeds are named by short symbol, matching data_dict, contract_multipliers, commission info and the band cache
+        cerebro.adddata(data, name=short_name)
 
         contract_multipliers[short_name] = symbol_info['contract_multiplier']
 
@@ -49,16 +55,49 @@ def run_backtest():
             )
         cerebro.broker.addcommissioninfo(comminfo, name=short_name)
 
-
         data_dict[short_name] = df
 
+    # Parameter grids for the walkforward optimizer and the grid search
+    wf_param_grid = {
+        'breakout_window': [10, 20, 30],
+        'trailing_stop_pct': [0.02, 0.03],
+        'risk_per_trade': [0.005, 0.01],
+        'contract_multipliers': [contract_multipliers],
+        'correlation_window': [config['strategy'].get('correlation_window', 60)],
+        'correlation_sizing': [config['strategy'].get('correlation_sizing', False)],
+        'max_portfolio_heat': [config['strategy'].get('max_portfolio_heat')],
+        'band_timeframe': [band_timeframe]
+    }
+
+    grid_param_grid = {
+        'breakout_window': [10, 20, 30],
+        'trailing_stop_pct': [0.02, 0.03, 0.05],
+        'risk_per_trade': [0.005, 0.01],
+        'contract_multipliers': [contract_multipliers],
+        'correlation_window': [config['strategy'].get('correlation_window', 60)],
+        'correlation_sizing': [config['strategy'].get('correlation_sizing', False)],
+        'max_portfolio_heat': [config['strategy'].get('max_portfolio_heat')],
+        'band_timeframe': [band_timeframe]
+    }
+
+    if band_timeframe:
+        windows = {config['strategy']['breakout_window']}
+        windows.update(wf_param_grid['breakout_window'])
+        windows.update(grid_param_grid['breakout_window'])
+        # Prime before the first run so the backtest, walkforward and sweeps all reuse the cache
+        prime_band_cache(data_dict, band_timeframe, windows=sorted(windows))
+
     cerebro.broker.set_slippage_perc(perc=0.001)
     cerebro.addstrategy(
         PortfolioBreakoutStrategy,
         breakout_window=config['strategy']['breakout_window'],
         trailing_stop_pct=config['strategy']['trailing_stop_pct'],
         risk_per_trade=config['strategy']['risk_per_trade'],
-        contract_multipliers=contract_multipliers
+        contract_multipliers=contract_multipliers,
+        correlation_window=config['strategy'].get('correlation_window', 60),
+        correlation_sizing=config['strategy'].get('correlation_sizing', False),
+        max_portfolio_heat=config['strategy'].get('max_portfolio_heat'),
+        band_timeframe=band_timeframe
     )
 
     print('[MAIN] - Starting Portfolio Value: %.2f' % cerebro.broker.getvalue())
@@ -97,7 +136,11 @@ def run_backtest():
         breakout_window=config['strategy']['breakout_window'],
         trailing_stop_pct=config['strategy']['trailing_stop_pct'],
         risk_per_trade=config['strategy']['risk_per_trade'],
-        contract_multipliers=contract_multipliers
+        contract_multipliers=contract_multipliers,
+        correlation_window=config['strategy'].get('correlation_window', 60),
+        correlation_sizing=config['strategy'].get('correlation_sizing', False),
+        max_portfolio_heat=config['strategy'].get('max_portfolio_heat'),
+        band_timeframe=band_timeframe
     )
 
     print("\n[MAIN] - ===== WALKFORWARD RESULTS =====")
@@ -107,19 +150,12 @@ def run_backtest():
     print("[MAIN] - Walkforward results saved to reports/walkforward_results.csv")
 
     # Walk Forward Optimizer
-    param_grid = {
-        'breakout_window': [10, 20, 30],
-        'trailing_stop_pct': [0.02, 0.03],
-        'risk_per_trade': [0.005, 0.01],
-        'contract_multipliers': [contract_multipliers]
-    }
-
     wf_optimization_results = run_walkforward_optimizer(
         strategy_class=PortfolioBreakoutStrategy,
         data_dict=data_dict,
         start_date=config['start_date'],
         end_date=config['end_date'],
-        param_grid=param_grid,
+        param_grid=wf_param_grid,
         train_years=2,
         test_months=6,
         initial_cash=config['initial_cash']
@@ -130,18 +166,16 @@ def run_backtest():
 
     wf_optimization_results.to_csv('reports/walkforward_optimizer_results.csv', index=False)
 
-    param_grid = {
-        'breakout_window': [10, 20, 30],
-        'trailing_stop_pct': [0.02, 0.03, 0.05],
-        'risk_per_trade': [0.005, 0.01],
-        'contract_multipliers': [contract_multipliers]
-    }
+    # Grid Search
+    store = ResultStore('reports/grid_search.db', sweep='grid')
+    store.clear()
 
     grid_results = run_grid_search(
         strategy_class=PortfolioBreakoutStrategy,
         data_dict=data_dict,
-        param_grid=param_grid,
-        initial_cash=config['initial_cash']
+        param_grid=grid_param_grid,
+        initial_cash=config['initial_cash'],
+        store=store
     )
 
     weights = {
@@ -154,13 +188,15 @@ def run_backtest():
 
     scored_results = add_composite_score(grid_results, weights=weights)
 
-    print(scored_results)
+    print(scored_results.top(20))
 
-    scored_results.to_csv('reports/grid_search_with_scores.csv', index=False)
+    scored_results.export_csv('reports/grid_search_with_scores.csv')
 
     plot_heatmap(scored_results, x='breakout_window', y='trailing_stop_pct', metric='PnL')
     plot_heatmap(scored_results, x='breakout_window', y='trailing_stop_pct', metric='Sharpe')
     plot_heatmap(scored_results, x='breakout_window', y='trailing_stop_pct', metric='Composite_Score')
 
+    store.close()
+
 if __name__ == '__main__':
     run_backtest()
\ No newline at end of file
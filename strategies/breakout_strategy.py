@@ -1,4 +1,6 @@
 import backtrader as bt
+from utils.portfolio_risk import PortfolioRisk
+from utils.band_cache import get_bands
 
 
 class PortfolioBreakoutStrategy(bt.Strategy):
@@ -7,11 +9,22 @@ class PortfolioBreakoutStrategy(bt.Strategy):
         ('trailing_stop_pct', 0.03),
         ('risk_per_trade', 0.01),
         ('contract_multipliers', {}),
+        ('correlation_window', 60),
+        ('correlation_sizing', False),
+        ('max_portfolio_heat', None),
+        ('band_timeframe', None),  # e.g. '1d': breakout bands on daily bars, execution on the feed's bars
     )
 
     def __init__(self):
-        self.highest = {d._name: bt.indicators.Highest(d.high, period=self.p.breakout_window) for d in self.datas}
-        self.lowest = {d._name: bt.indicators.Lowest(d.low, period=self.p.breakout_window) for d in self.datas}
+        if self.p.band_timeframe:
+            # Multi-timeframe: precomputed higher-timeframe bands, aligned to the execution bars
+            self.bands = {
+                d._name: get_bands(d._name, d.p.dataname, self.p.band_timeframe, self.p.breakout_window)
+                for d in self.datas
+            }
+        else:
+            self.highest = {d._name: bt.indicators.Highest(d.high, period=self.p.breakout_window) for d in self.datas}
+            self.lowest = {d._name: bt.indicators.Lowest(d.low, period=self.p.breakout_window) for d in self.datas}
 
         # Trade state dictionaries per symbol
         self.entry_price = {}
@@ -23,25 +36,43 @@ class PortfolioBreakoutStrategy(bt.Strategy):
         self.open_trades = {}
         self.trade_log = {d._name: [] for d in self.datas}
 
+        # Portfolio-level risk (rolling covariance + open risk across symbols)
+        self.risk = PortfolioRisk([d._name for d in self.datas], window=self.p.correlation_window)
+
 
     def log(self, txt):
         dt = self.datas[0].datetime.date(0)
         print(f'[STRATEGY] - [{dt}] {txt}')
 
+    def high_break(self, data):
+        if self.p.band_timeframe:
+            return self.bands[data._name][0][len(data) - 1]
+        return self.highest[data._name][-1]
+
+    def low_break(self, data):
+        if self.p.band_timeframe:
+            return self.bands[data._name][1][len(data) - 1]
+        return self.lowest[data._name][-1]
+
     def next(self):
+        self.risk.update({d._name: d.close[0] for d in self.datas})
+
         for data in self.datas:
             sym = data._name
             price = data.close[0]
 
-            self.log(f"[{sym}] Close: {price} | High_Break: {self.highest[sym][-1]} | Low_Break: {self.lowest[sym][-1]}")
+            high_break = self.high_break(data)
+            low_break = self.low_break(data)
+
+            self.log(f"[{sym}] Close: {price} | High_Break: {high_break} | Low_Break: {low_break}")
 
             pos = self.getposition(data)
 
             if not pos:
-                if price > self.highest[sym][-1]:
+                if price > high_break:
                     self.enter_trade(data, sym, price, direction='long')
 
-                elif price < self.lowest[sym][-1]:
+                elif price < low_break:
                     self.enter_trade(data, sym, price, direction='short')
 
             else:
@@ -50,12 +81,12 @@ class PortfolioBreakoutStrategy(bt.Strategy):
     def enter_trade(self, data, sym, price, direction):
         if direction == 'long':
             entry = price
-            stop = self.lowest[sym][-1]
+            stop = self.low_break(data)
             risk_per_unit = entry - stop
 
         else:  # short
             entry = price
-            stop = self.highest[sym][-1]
+            stop = self.high_break(data)
             risk_per_unit = stop - entry
 
         if risk_per_unit <= 0:
@@ -63,10 +94,19 @@ class PortfolioBreakoutStrategy(bt.Strategy):
             return
 
         # Risk-based sizing
-        cash = self.broker.get_cash()
-        risk_amount = cash * self.p.risk_per_trade
+        # Sizing and the heat cap share one base: account equity
+        equity = self.broker.getvalue()
+        risk_amount = equity * self.p.risk_per_trade
         multiplier = self.p.contract_multipliers.get(sym, 1)
 
+        if self.p.correlation_sizing:
+            risk_amount *= self.risk.correlation_scale(sym, direction)
+
+        available = self.risk.available_risk(equity, self.p.max_portfolio_heat)
+        if risk_amount > available:
+            self.log(f"[{sym}] Portfolio heat cap reached, risk reduced {risk_amount:.2f} -> {available:.2f}")
+            risk_amount = available
+
         size = int(risk_amount / (risk_per_unit * multiplier))
 
         if size <= 0:
@@ -85,6 +125,7 @@ class PortfolioBreakoutStrategy(bt.Strategy):
         self.stop_price[sym] = stop
         self.trailing_stop[sym] = trailing
         self.direction[sym] = direction
+        self.risk.open_position(sym, direction, size * risk_per_unit * multiplier)
 
         self.open_trades[sym] = {
             'direction': direction,
@@ -132,6 +173,13 @@ class PortfolioBreakoutStrategy(bt.Strategy):
                 self.close(data=data)
                 self.reset_trade(sym)
 
+    def notify_order(self, order):
+        # Release risk booked at submission if the order never filled
+        if order.status in [order.Rejected, order.Margin, order.Canceled]:
+            sym = order.data._name
+            self.log(f"[{sym}] Order {order.getstatusname()}, releasing booked risk.")
+            self.risk.close_position(sym)
+
     def notify_trade(self, trade):
         if trade.isclosed:
             data = trade.data
@@ -169,4 +217,5 @@ class PortfolioBreakoutStrategy(bt.Strategy):
         self.entry_price.pop(sym, None)
         self.stop_price.pop(sym, None)
         self.trailing_stop.pop(sym, None)
-        self.direction.pop(sym, None)
\ No newline at end of file
+        self.direction.pop(sym, None)
+        self.risk.close_position(sym)
\ No newline at end of file
@@ -0,0 +1,157 @@
+import hashlib
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# In-process cache: (symbol, timeframe, window) -> {'fingerprint', 'bands'}
+_CACHE = {}
+
+_UNITS = {'m': 'min', 'h': 'h', 'd': 'D', 'wk': 'W', 'mo': 'MS'}
+
+
+def resample_rule(timeframe):
+    """
+    Convert a Yahoo-style interval ('5m', '1h', '1d', '1wk', '1mo') to a pandas resample rule.
+    """
+    match = re.fullmatch(r'(\d+)(m|h|d|wk|mo)', timeframe)
+    if not match:
+        raise ValueError(f"Unsupported band timeframe: {timeframe}")
+
+    count, unit = match.groups()
+    return f"{count}{_UNITS[unit]}"
+
+
+def compute_bands(df, timeframe, window):
+    """
+    Resample `df` to `timeframe` and compute the breakout bands on completed bars.
+    band_high/band_low at a higher-timeframe bar are the rolling high/low of the
+    `window` bars before it, so they never include the bar still forming.
+    """
+    htf = df[['High', 'Low']].resample(resample_rule(timeframe), label='left', closed='left').agg(
+        {'High': 'max', 'Low': 'min'}
+    ).dropna()
+
+    return pd.DataFrame({
+        'band_high': htf['High'].rolling(window).max().shift(1),
+        'band_low': htf['Low'].rolling(window).min().shift(1),
+    })
+
+
+def _cache_path(cache_dir, symbol, timeframe, window):
+    return f"{cache_dir}/{timeframe}/{symbol}_{window}.pkl"
+
+
+def fingerprint(df):
+    """
+    Small fingerprint of a source series: bar interval, row count, first/last
+    timestamp and a digest of High/Low. O(n), so it is computed once per series
+    in `prime_band_cache`, never per strategy run.
+    """
+    stamps = df.index.asi8
+    digest = hashlib.sha1()
+    for col in ('High', 'Low'):
+        digest.update(np.ascontiguousarray(df[col].to_numpy(dtype='float64')).data)
+
+    return {
+        'interval': int(np.diff(stamps).min()) if len(stamps) > 1 else None,
+        'rows': len(df),
+        'first': df.index[0],
+        'last': df.index[-1],
+        'hash': digest.hexdigest(),
+    }
+
+
+def _covers(entry, df):
+    fp = entry['fingerprint']
+    return fp['first'] <= df.index[0] and df.index[-1] <= fp['last']
+
+
+def _read_entry(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        entry = pd.read_pickle(path)
+    except Exception as e:
+        print(f"[BAND CACHE] - Ignoring unreadable cache file {path}: {e}")
+        return None
+    if not isinstance(entry, dict) or 'fingerprint' not in entry:  # legacy entry
+        return None
+    return entry
+
+
+def _write_entry(entry, path):
+    # Write to a private temp file, then atomically swap it in so concurrent workers never read a partial pickle
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pd.to_pickle(entry, tmp)
+    os.replace(tmp, path)
+
+
+def _store(key, entry, path):
+    _write_entry(entry, path)
+    _CACHE[key] = entry
+
+
+def get_htf_bands(symbol, df, timeframe, window, cache_dir='data/bands'):
+    """
+    Higher-timeframe bands for `symbol`, cached in memory and on disk per
+    (symbol, timeframe, window). This is the per-run hot path: a hit only checks
+    that `df` lies within the cached series (O(1)). Content validation happens
+    once per series in `prime_band_cache`.
+    """
+    key = (symbol, timeframe, window)
+    path = _cache_path(cache_dir, symbol, timeframe, window)
+
+    entry = _CACHE.get(key)
+    if entry is None:
+        entry = _read_entry(path)
+        if entry is not None:
+            _CACHE[key] = entry
+
+    if entry is not None and _covers(entry, df):
+        return entry['bands']
+
+    # Not primed for this range: compute from `df`, and only keep it if it is not narrower than the cached entry
+    new_entry = {'fingerprint': fingerprint(df), 'bands': compute_bands(df, timeframe, window)}
+    if entry is None or new_entry['fingerprint']['rows'] >= entry['fingerprint']['rows']:
+        _store(key, new_entry, path)
+
+    return new_entry['bands']
+
+
+def get_bands(symbol, df, timeframe, window, cache_dir='data/bands'):
+    """
+    Bands aligned to the execution (lower-timeframe) bars of `df`.
+    Each bar sees the bands of the higher-timeframe bar it falls in.
+
+    :return: (band_high, band_low) numpy arrays, one value per row of `df`.
+    """
+    bands = get_htf_bands(symbol, df, timeframe, window, cache_dir=cache_dir)
+    aligned = bands.reindex(df.index, method='ffill')
+
+    return aligned['band_high'].to_numpy(), aligned['band_low'].to_numpy()
+
+
+def prime_band_cache(data_dict, timeframe, windows, cache_dir='data/bands'):
+    """
+    Precompute bands for every symbol and breakout window before a backtest or sweep,
+    on the full series so walkforward slices are covered too. Each series is
+    fingerprinted once; cached entries whose fingerprint differs (data fix,
+    different bar interval) are recomputed.
+    """
+    for sym, df in data_dict.items():
+        fp = fingerprint(df)
+
+        for window in windows:
+            key = (sym, timeframe, window)
+            path = _cache_path(cache_dir, sym, timeframe, window)
+
+            entry = _read_entry(path)
+            if entry is not None and entry['fingerprint'] == fp:
+                _CACHE[key] = entry
+                print(f"[BAND CACHE] - Reused {sym} {timeframe} bands (window={window})")
+                continue
+
+            _store(key, {'fingerprint': fp, 'bands': compute_bands(df, timeframe, window)}, path)
+            print(f"[BAND CACHE] - Cached {sym} {timeframe} bands (window={window})")
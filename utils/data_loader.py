@@ -1,26 +1,49 @@
 import os
 import pandas as pd
-import yfinance as yf
 
-def load_price_data(symbol, interval="1d", start="2010-01-01", end="2025-12-31"):
+def to_naive_datetime(dates, tz="America/New_York"):
+    """
+    Parse timestamps to tz-naive exchange-local time.
+    Intraday Yahoo data carries UTC offsets (one offset -> tz-aware, offsets across
+    a DST change -> unparsed strings); both break date filtering and resampling.
+    """
+    try:
+        parsed = pd.to_datetime(dates)
+    except ValueError:  # mixed offsets
+        parsed = pd.to_datetime(dates, utc=True)
+
+    if parsed.dtype == object:
+        parsed = pd.to_datetime(dates, utc=True)
+
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_convert(tz).dt.tz_localize(None)
+
+    return parsed
+
+
+def load_price_data(symbol, interval="1d", start="2010-01-01", end="2025-12-31", tz="America/New_York"):
     folder = f"data/{interval}"
     os.makedirs(folder, exist_ok=True)
 
     path = f"{folder}/{symbol}.csv"
 
     if os.path.exists(path):
-        df = pd.read_csv(path, parse_dates=["Date"])
+        df = pd.read_csv(path)
+        df["Date"] = to_naive_datetime(df["Date"], tz)
         df = df.set_index("Date")
         print(f"[LOADER] - Loaded {symbol} from {path}")
     else:
         print(f"[DOWNLOADER] - Downloading {symbol} from Yahoo Finance...")
         try:
+            import yfinance as yf
+
             df = yf.download(symbol, start=start, end=end, interval=interval)
             if df.empty:
                 raise ValueError(f"No data found for {symbol} from Yahoo.")
 
             df.columns = [col[0] if isinstance(col, tuple) else col for col in df.columns]
-            df = df.reset_index()
+            df = df.reset_index().rename(columns={'Datetime': 'Date'})  # intraday intervals index on Datetime
+            df["Date"] = to_naive_datetime(df["Date"], tz)
             df.to_csv(path, index=False)
             print(f"[DOWNLOADER] - Saved {symbol} to {path}")
 
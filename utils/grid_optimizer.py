@@ -1,67 +1,41 @@
 import itertools
 import pandas as pd
-import backtrader as bt
-from joblib import Parallel, delayed
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+from utils.worker import compute_metrics
+from utils.result_store import ResultStore
 
-def compute_metrics(strategy_class, data_dict, params, initial_cash):
-    cerebro = bt.Cerebro()
-    cerebro.broker.set_cash(initial_cash)
-
-    for sym, df in data_dict.items():
-        data = bt.feeds.PandasData(dataname=df)
-        cerebro.adddata(data, name=sym)
-
-    cerebro.addstrategy(strategy_class, **params)
-
-    try:
-        results = cerebro.run()
-        strat = results[0]
-
-        pnl_df = pd.concat([pd.DataFrame(v) for v in strat.trade_log.values()], ignore_index=True)
-        pnl_df = pnl_df.sort_values(by='exit_date')
-
-        pnl_series = pnl_df['pnl']
-
-        cumulative = pnl_series.cumsum()
-        rolling_max = cumulative.cummax()
-        drawdown = rolling_max - cumulative
-
-        max_drawdown = drawdown.max() if not drawdown.empty else 0
-        sharpe = (pnl_series.mean() / pnl_series.std()) * (252 ** 0.5) if pnl_series.std() != 0 else 0
-
-        win_rate = (pnl_series > 0).mean() * 100 if not pnl_series.empty else 0
-
-        gross_profit = pnl_series[pnl_series > 0].sum()
-        gross_loss = -pnl_series[pnl_series < 0].sum()
-        profit_factor = gross_profit / gross_loss if gross_loss != 0 else np.inf
+def run_grid_search(strategy_class, data_dict, param_grid, initial_cash=100000, n_jobs=-1,
+                    store=None, tags=None):
+    """
+    Run every parameter combination in parallel.
 
-        pnl = cerebro.broker.getvalue() - initial_cash
+    :param store: Optional ResultStore. Results are streamed into it as workers
+                  finish and the store is returned instead of a DataFrame.
+    :param tags: Extra columns added to every row (e.g. {'symbol_set': 'MES+MNQ', 'window': '2022H1'}).
+    """
+    from joblib import Parallel, delayed
 
-    except Exception as e:
-        print(f"[GRID OPTIMIZER] - Error for {params}: {e}")
-        pnl = None
-        sharpe = None
-        max_drawdown = None
-        win_rate = None
-        profit_factor = None
+    keys, values = zip(*param_grid.items())
+    param_combinations = [dict(zip(keys, v)) for v in itertools.product(*values)]
+    tags = tags or {}
 
-    return {**params, 'PnL': pnl, 'Sharpe': sharpe, 'Max_Drawdown': max_drawdown,
-            'Win_Rate': win_rate, 'Profit_Factor': profit_factor}
+    if store is not None:
+        results = Parallel(n_jobs=n_jobs, return_as='generator_unordered')(
+            delayed(compute_metrics)(strategy_class, data_dict, params, initial_cash)
+            for params in param_combinations
+        )
 
+        for result in results:
+            store.add({**tags, **result})
+        store.flush()
 
-def run_grid_search(strategy_class, data_dict, param_grid, initial_cash=100000, n_jobs=-1):
-    keys, values = zip(*param_grid.items())
-    param_combinations = [dict(zip(keys, v)) for v in itertools.product(*values)]
+        return store
 
     results = Parallel(n_jobs=n_jobs)(
         delayed(compute_metrics)(strategy_class, data_dict, params, initial_cash)
         for params in param_combinations
     )
 
-    results_df = pd.DataFrame(results).sort_values(by='PnL', ascending=False)
+    results_df = pd.DataFrame([{**tags, **r} for r in results]).sort_values(by='PnL', ascending=False)
 
     return results_df
 
@@ -70,7 +44,7 @@ def add_composite_score(results_df, weights=None):
     """
     Add composite scoring based on customizable weights.
 
-    :param results_df: DataFrame with metrics.
+    :param results_df: DataFrame with metrics, or a ResultStore (scored in place via SQL).
     :param weights: Dictionary of weights.
     Example:
         {
@@ -85,6 +59,9 @@ def add_composite_score(results_df, weights=None):
     if weights is None:
         weights = {'PnL': 1.0, 'Sharpe': 1.0, 'Win_Rate': 1.0, 'Profit_Factor': 1.0, 'Max_Drawdown': -1.0}
 
+    if isinstance(results_df, ResultStore):
+        return results_df.score(weights)
+
     score = (
         (results_df['PnL'].fillna(0) * weights.get('PnL', 0)) +
         (results_df['Sharpe'].fillna(0) * weights.get('Sharpe', 0)) +
@@ -102,17 +79,26 @@ def plot_heatmap(results_df, x, y, metric='PnL', subgroup='risk_per_trade'):
     """
     Creates a heatmap for each unique value in `subgroup`.
 
-    :param results_df: The grid search result DataFrame.
+    :param results_df: The grid search result DataFrame, or a ResultStore (indexed lookups per subgroup).
     :param x: The column to use for heatmap x-axis (e.g., 'breakout_window').
     :param y: The column to use for heatmap y-axis (e.g., 'trailing_stop_pct').
     :param metric: The metric to display ('PnL', 'Sharpe', etc.).
     :param subgroup: The column to split into multiple heatmaps (e.g., 'risk_per_trade').
     """
-    unique_subgroups = results_df[subgroup].unique()
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if isinstance(results_df, ResultStore):
+        unique_subgroups = results_df.subgroup_values(subgroup)
+    else:
+        unique_subgroups = results_df[subgroup].unique()
 
     for subgroup_value in sorted(unique_subgroups):
-        subset = results_df[results_df[subgroup] == subgroup_value]
-        pivot = subset.pivot_table(index=y, columns=x, values=metric, aggfunc='mean')
+        if isinstance(results_df, ResultStore):
+            pivot = results_df.heatmap_slice(x, y, metric, subgroup=subgroup, subgroup_value=subgroup_value)
+        else:
+            subset = results_df[results_df[subgroup] == subgroup_value]
+            pivot = subset.pivot_table(index=y, columns=x, values=metric, aggfunc='mean')
 
         plt.figure(figsize=(8, 6))
         sns.heatmap(pivot, annot=True, fmt=".1f", cmap="YlGnBu")
@@ -1,7 +1,5 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 def performance_summary(trade_logs):
     if isinstance(trade_logs, dict):
@@ -54,6 +52,8 @@ def performance_summary(trade_logs):
 
 
 def plot_equity_curve(trade_logs):
+    import matplotlib.pyplot as plt
+
     if isinstance(trade_logs, dict):
         logs = pd.concat([pd.DataFrame(v) for v in trade_logs.values()], ignore_index=True)
     else:
@@ -0,0 +1,122 @@
+import math
+from collections import deque
+
+
+class PortfolioRisk:
+    """
+    Portfolio-level risk book shared by all symbols of a strategy.
+    - Rolling returns covariance, updated incrementally every bar (O(1) per symbol pair).
+    - Open risk per symbol and total portfolio heat.
+    - Correlation-aware scaling for new entries.
+    """
+
+    def __init__(self, symbols, window=60):
+        self.symbols = list(symbols)
+        self.window = window
+        self.index = {sym: i for i, sym in enumerate(self.symbols)}
+
+        n = len(self.symbols)
+
+        # Rolling window of per-bar return rows, plus running sums over that window
+        self.returns = deque()
+        self.sums = [0.0] * n
+        self.cross_sums = [[0.0] * n for _ in range(n)]
+
+        self.last_close = {}
+
+        # Open positions: symbol -> dollar risk / direction
+        self.open_risk = {}
+        self.direction = {}
+
+    def update(self, closes):
+        """
+        Push one bar of closes {symbol: price} and roll the window forward.
+        Symbols without a valid previous/current close contribute a zero return.
+        """
+        row = []
+        for sym in self.symbols:
+            price = closes.get(sym)
+            prev = self.last_close.get(sym)
+
+            if price is None or math.isnan(price) or price <= 0:
+                row.append(0.0)
+                continue
+
+            row.append(price / prev - 1 if prev else 0.0)
+            self.last_close[sym] = price
+
+        self._add_row(row, sign=1)
+        self.returns.append(row)
+
+        if len(self.returns) > self.window:
+            self._add_row(self.returns.popleft(), sign=-1)
+
+    def _add_row(self, row, sign):
+        n = len(row)
+        for i in range(n):
+            r_i = row[i]
+            self.sums[i] += sign * r_i
+            cross_i = self.cross_sums[i]
+            for j in range(i, n):
+                cross_i[j] += sign * r_i * row[j]
+
+    def is_warm(self):
+        return len(self.returns) >= self.window
+
+    def covariance(self, sym_a, sym_b):
+        n = len(self.returns)
+        if n < 2:
+            return 0.0
+
+        i, j = sorted((self.index[sym_a], self.index[sym_b]))
+        return (self.cross_sums[i][j] - self.sums[i] * self.sums[j] / n) / (n - 1)
+
+    def correlation(self, sym_a, sym_b):
+        var_a = self.covariance(sym_a, sym_a)
+        var_b = self.covariance(sym_b, sym_b)
+
+        if var_a <= 0 or var_b <= 0:
+            return 0.0
+
+        rho = self.covariance(sym_a, sym_b) / math.sqrt(var_a * var_b)
+        return max(-1.0, min(1.0, rho))
+
+    def correlation_scale(self, sym, direction):
+        """
+        Size multiplier in (0, 1] for a new position in `sym`.
+        Each open position whose exposure moves with the new one (same-direction
+        positive correlation, or opposite-direction negative correlation) shrinks it.
+        """
+        if not self.is_warm():
+            return 1.0
+
+        sign = 1 if direction == 'long' else -1
+        overlap = 0.0
+
+        for other, other_direction in self.direction.items():
+            if other == sym:
+                continue
+            other_sign = 1 if other_direction == 'long' else -1
+            overlap += max(0.0, self.correlation(sym, other) * sign * other_sign)
+
+        return 1.0 / (1.0 + overlap)
+
+    def total_open_risk(self):
+        return sum(self.open_risk.values())
+
+    def available_risk(self, equity, max_heat):
+        """
+        Dollar risk still available under the portfolio heat cap (fraction of equity).
+        """
+        if max_heat is None:
+            return float('inf')
+
+        return max(0.0, equity * max_heat - self.total_open_risk())
+
+    def open_position(self, sym, direction, risk):
+        self.open_risk[sym] = risk
+        self.direction[sym] = direction
+
+    def close_position(self, sym):
+        self.open_risk.pop(sym, None)
+        self.direction.pop(sym, None)
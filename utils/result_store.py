@@ -0,0 +1,188 @@
+import json
+import os
+import sqlite3
+import pandas as pd
+
+METRICS = ['PnL', 'Sharpe', 'Max_Drawdown', 'Win_Rate', 'Profit_Factor', 'Composite_Score']
+
+
+class ResultStore:
+    """
+    Indexed SQLite store for sweep results.
+    - Rows are streamed in (batched inserts) as workers finish.
+    - Inserts only maintain the (sweep, Composite_Score) index; heatmap slices
+      get a (sweep, subgroup, y, x) index on first use, so lookups never scan
+      the full table.
+    - Composite scoring is a single UPDATE over the sweep.
+    """
+
+    def __init__(self, path='reports/grid_search.db', sweep='grid', batch_size=1000):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self.path = path
+        self.sweep = sweep
+        self.batch_size = batch_size
+        self.pending = []
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        metric_cols = ", ".join(f'"{m}" REAL' for m in METRICS)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY, sweep TEXT NOT NULL, {metric_cols})"
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_results_score ON results(sweep, "Composite_Score")')
+        self.conn.commit()
+
+        self.columns = [row[1] for row in self.conn.execute("PRAGMA table_info(results)")]
+
+    # ---------- Writing ----------
+
+    def add(self, row):
+        self.pending.append(row)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, rows):
+        for row in rows:
+            self.add(row)
+        self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        keys = []
+        for row in self.pending:
+            for k in row:
+                if k not in keys:
+                    keys.append(k)
+
+        self._ensure_columns(keys)
+
+        cols = ", ".join(f'"{k}"' for k in keys)
+        placeholders = ", ".join("?" for _ in range(len(keys) + 1))
+        values = [
+            (self.sweep, *(self._to_sql(row.get(k)) for k in keys))
+            for row in self.pending
+        ]
+
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO results (sweep, {cols}) VALUES ({placeholders})", values)
+
+        self.pending = []
+
+    def _ensure_columns(self, keys):
+        for k in keys:
+            if k in self.columns:
+                continue
+
+            with self.conn:
+                self.conn.execute(f'ALTER TABLE results ADD COLUMN "{k}"')
+            self.columns.append(k)
+
+    def _ensure_index(self, keys):
+        name = "idx_results_" + "_".join(keys)
+        cols = ", ".join(f'"{k}"' for k in keys)
+        with self.conn:
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON results({cols})')
+
+    @staticmethod
+    def _to_sql(value):
+        if isinstance(value, (dict, list, tuple)):
+            return json.dumps(value, sort_keys=True)
+        if hasattr(value, 'item'):  # numpy scalar
+            return value.item()
+        return value
+
+    def clear(self):
+        self.pending = []
+        with self.conn:
+            self.conn.execute("DELETE FROM results WHERE sweep = ?", (self.sweep,))
+
+    # ---------- Queries ----------
+
+    def score(self, weights):
+        """
+        Recompute Composite_Score for the whole sweep in one vectorized UPDATE.
+        Same formula as `add_composite_score`.
+        """
+        self.flush()
+
+        # Zero-weight terms are left out so an inf metric (e.g. Profit_Factor) does not turn the score NULL
+        terms = [f'COALESCE("{m}", 0) * :{m}' for m in METRICS[:-1] if weights.get(m, 0)]
+        expr = " + ".join(terms) if terms else "0"
+
+        params = {m: weights.get(m, 0) for m in METRICS[:-1]}
+        params['Win_Rate'] = params['Win_Rate'] / 100
+        params['sweep'] = self.sweep
+
+        with self.conn:
+            self.conn.execute(f"UPDATE results SET Composite_Score = {expr} WHERE sweep = :sweep", params)
+
+        return self
+
+    def subgroup_values(self, column):
+        self.flush()
+        rows = self.conn.execute(
+            f'SELECT DISTINCT "{column}" FROM results WHERE sweep = ? ORDER BY "{column}"', (self.sweep,)
+        )
+        return [r[0] for r in rows]
+
+    def heatmap_slice(self, x, y, metric, subgroup=None, subgroup_value=None):
+        """
+        Mean `metric` by (y, x) for one subgroup value, aggregated inside SQLite.
+        Returns a pivoted DataFrame (index=y, columns=x) ready for plotting.
+        """
+        self.flush()
+
+        where = "sweep = ?"
+        args = [self.sweep]
+        keys = ['sweep']
+        if subgroup is not None:
+            where += f' AND "{subgroup}" = ?'
+            args.append(subgroup_value)
+            keys.append(subgroup)
+
+        self._ensure_index(keys + [y, x])
+
+        query = (
+            f'SELECT "{y}" AS y, "{x}" AS x, AVG("{metric}") AS value FROM results '
+            f'WHERE {where} GROUP BY "{y}", "{x}"'
+        )
+        cells = pd.read_sql_query(query, self.conn, params=args)
+
+        return cells.pivot(index='y', columns='x', values='value').rename_axis(index=y, columns=x)
+
+    def top(self, n=20, by='Composite_Score'):
+        self.flush()
+        return self.to_dataframe(order_by=by, limit=n)
+
+    def to_dataframe(self, order_by='PnL', limit=None):
+        self.flush()
+
+        query = f'SELECT * FROM results WHERE sweep = ? ORDER BY "{order_by}" DESC'
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+
+        df = pd.read_sql_query(query, self.conn, params=[self.sweep])
+        return df.drop(columns=['id', 'sweep'])
+
+    def export_csv(self, path, order_by='Composite_Score', chunksize=100000):
+        """
+        Stream the sweep to CSV in chunks instead of materializing it in memory.
+        """
+        self.flush()
+
+        query = f'SELECT * FROM results WHERE sweep = ? ORDER BY "{order_by}" DESC'
+        chunks = pd.read_sql_query(query, self.conn, params=[self.sweep], chunksize=chunksize)
+
+        for i, chunk in enumerate(chunks):
+            chunk.drop(columns=['id', 'sweep']).to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
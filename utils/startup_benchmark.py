@@ -0,0 +1,71 @@
+"""
+Cold-start timing for the CLI and for a spawned joblib worker pool.
+
+Every measurement runs in a fresh interpreter, so import caches are cold.
+Run it on two checkouts (before / after a change) and compare:
+
+    python -m utils.startup_benchmark
+    python -m utils.startup_benchmark --target utils.grid_optimizer:compute_metrics
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+CLI_SNIPPET = "import main"
+
+# Parent-side imports happen before the timer, so the figure is worker spawn + worker-side unpickling only
+POOL_SNIPPET = """
+import time
+from joblib import Parallel, delayed
+from utils.startup_benchmark import probe
+from {module} import {func} as target
+start = time.perf_counter()
+Parallel(n_jobs={n_jobs}, backend='loky')(delayed(probe)(target) for _ in range({n_jobs}))
+print(time.perf_counter() - start)
+"""
+
+
+def probe(func):
+    """
+    Runs inside a worker. Receiving `func` forces the worker to import its module.
+    """
+    return func.__name__
+
+
+def time_cli(repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", CLI_SNIPPET], check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_worker_pool(target, n_jobs, repeat):
+    module, func = target.split(":")
+    snippet = POOL_SNIPPET.format(module=module, func=func, n_jobs=n_jobs)
+
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", snippet], check=True, capture_output=True, text=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def report(label, timings):
+    print(f"[BENCHMARK] - {label}: median {statistics.median(timings):.3f}s | "
+          f"min {min(timings):.3f}s | max {max(timings):.3f}s | runs {len(timings)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="utils.worker:compute_metrics",
+                        help="module:function the workers unpickle")
+    parser.add_argument("--n-jobs", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report("CLI import (main.py)", time_cli(args.repeat))
+    report(f"Worker pool x{args.n_jobs} ({args.target})", time_worker_pool(args.target, args.n_jobs, args.repeat))
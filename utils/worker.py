@@ -0,0 +1,54 @@
+"""
+Lightweight worker entry point for parallel sweeps.
+Imports only the simulation path (backtrader, pandas, numpy) so joblib workers
+that unpickle `compute_metrics` do not pay for plotting or download libraries.
+"""
+import pandas as pd
+import backtrader as bt
+import numpy as np
+
+
+def compute_metrics(strategy_class, data_dict, params, initial_cash):
+    cerebro = bt.Cerebro()
+    cerebro.broker.set_cash(initial_cash)
+
+    for sym, df in data_dict.items():
+        data = bt.feeds.PandasData(dataname=df)
+        cerebro.adddata(data, name=sym)
+
+    cerebro.addstrategy(strategy_class, **params)
+
+    try:
+        results = cerebro.run()
+        strat = results[0]
+
+        pnl_df = pd.concat([pd.DataFrame(v) for v in strat.trade_log.values()], ignore_index=True)
+        pnl_df = pnl_df.sort_values(by='exit_date')
+
+        pnl_series = pnl_df['pnl']
+
+        cumulative = pnl_series.cumsum()
+        rolling_max = cumulative.cummax()
+        drawdown = rolling_max - cumulative
+
+        max_drawdown = drawdown.max() if not drawdown.empty else 0
+        sharpe = (pnl_series.mean() / pnl_series.std()) * (252 ** 0.5) if pnl_series.std() != 0 else 0
+
+        win_rate = (pnl_series > 0).mean() * 100 if not pnl_series.empty else 0
+
+        gross_profit = pnl_series[pnl_series > 0].sum()
+        gross_loss = -pnl_series[pnl_series < 0].sum()
+        profit_factor = gross_profit / gross_loss if gross_loss != 0 else np.inf
+
+        pnl = cerebro.broker.getvalue() - initial_cash
+
+    except Exception as e:
+        print(f"[GRID OPTIMIZER] - Error for {params}: {e}")
+        pnl = None
+        sharpe = None
+        max_drawdown = None
+        win_rate = None
+        profit_factor = None
+
+    return {**params, 'PnL': pnl, 'Sharpe': sharpe, 'Max_Drawdown': max_drawdown,
+            'Win_Rate': win_rate, 'Profit_Factor': profit_factor}